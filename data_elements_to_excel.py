@@ -1,9 +1,12 @@
 '''
-This code pulls data elements from a set of datasets in dhis2 and exports them into an Excel file.
+This code pulls data elements from a set of datasets in dhis2 and exports them into an Excel file (or CSV/Parquet).
 '''
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-from openpyxl import Workbook
 
 # load dhis2 credentials from .env file
 import os
@@ -14,36 +17,98 @@ DHIS2_USERNAME = os.getenv('DHIS2_USERNAME')
 DHIS2_PASSWORD = os.getenv('DHIS2_PASSWORD')
 auth = (DHIS2_USERNAME, DHIS2_PASSWORD)
 
+# number of dataset IDs requested per call, keeps the filter within URL length limits
+BATCH_SIZE = 100
+
+# number of batches fetched concurrently, kept below the connection pool size
+MAX_WORKERS = 8
+
+# shared session so every request to dhis2 reuses pooled keep-alive connections
+session = requests.Session()
+session.auth = auth
+# retry transient gateway errors so one blip doesn't abort the export
+retry = Retry(total=5, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+session.mount('https://', adapter)
+session.mount('http://', adapter)
+
+
+# function to fetch a batch of datasets from dhis2 API in a single request
+def fetch_datasets(dhis2_url, dataset_ids, session):
+    url = f"{dhis2_url}/api/dataSets.json?paging=false&filter=id:in:[{','.join(dataset_ids)}]&fields=id,dataSetElements[dataElement[id,displayName,code,domainType,valueType,categoryCombo[id,displayName]]]"
+    response = session.get(url)
+    response.raise_for_status()
+    return orjson.loads(response.content)['dataSets']
 
 # functiomn to fetch data elements from dhis2 API fo a given dataset or datasets
-def fetch_data_elements(dhis2_url, dataset_ids, auth):
-    data_elements = []
+def fetch_data_elements(dhis2_url, dataset_ids, session):
+    batches = [dataset_ids[i:i + BATCH_SIZE] for i in range(0, len(dataset_ids), BATCH_SIZE)]
+    datasets = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for batch in executor.map(lambda batch: fetch_datasets(dhis2_url, batch, session), batches):
+            for dataset in batch:
+                datasets[dataset['id']] = dataset
+
+    missing = [dataset_id for dataset_id in dataset_ids if dataset_id not in datasets]
+    if missing:
+        raise ValueError(f"Datasets not found: {', '.join(missing)}")
+
+    # accumulate one list per column and build the dataframe from them in one go
+    ds_ids, de_ids, names, codes, domain_types, value_types, cc_ids, cc_names = [], [], [], [], [], [], [], []
     for dataset_id in dataset_ids:
-        url = f"{dhis2_url}/api/dataSets/{dataset_id}.json?fields=dataSetElements[dataElement[id,displayName,code,domainType,valueType,categoryCombo[id,displayName]]]"
-        response = requests.get(url, auth=auth)
-        response.raise_for_status()
-        dataset = response.json()
-        for element in dataset['dataSetElements']:
+        for element in datasets[dataset_id]['dataSetElements']:
             de = element['dataElement']
-            data_elements.append({
-                'Dataset ID': dataset_id,
-                'Data Element ID': de['id'],
-                'Display Name': de['displayName'],
-                'Code': de.get('code', ''),
-                'Domain Type': de.get('domainType', ''),
-                'Value Type': de.get('valueType', ''),
-                'Category Combo ID': de['categoryCombo']['id'],
-                'Category Combo Name': de['categoryCombo']['displayName']
-            })
-    return data_elements
-
-def export_to_excel(data_elements, output_file):
-    df = pd.DataFrame(data_elements)
-    df.to_excel(output_file, index=False)
+            ds_ids.append(dataset_id)
+            de_ids.append(de['id'])
+            names.append(de['displayName'])
+            codes.append(de.get('code', ''))
+            domain_types.append(de.get('domainType', ''))
+            value_types.append(de.get('valueType', ''))
+            cc_ids.append(de['categoryCombo']['id'])
+            cc_names.append(de['categoryCombo']['displayName'])
+    return pd.DataFrame({
+        'Dataset ID': ds_ids,
+        'Data Element ID': de_ids,
+        'Display Name': names,
+        'Code': codes,
+        'Domain Type': domain_types,
+        'Value Type': value_types,
+        'Category Combo ID': cc_ids,
+        'Category Combo Name': cc_names
+    })
+
+# function to stream a dataframe into a write-only openpyxl workbook
+def write_openpyxl_streaming(df, output_file):
+    from openpyxl import Workbook
+    from openpyxl.utils.dataframe import dataframe_to_rows
+    wb = Workbook(write_only=True)
+    # match the sheet name pandas writes on the xlsxwriter path
+    ws = wb.create_sheet('Sheet1')
+    ws.append(list(df.columns))
+    for row in dataframe_to_rows(df, index=False, header=False):
+        ws.append(row)
+    wb.save(output_file)
+
+# function to export data elements as xlsx, or as csv/parquet when workbook features aren't needed
+def export_to_excel(data_elements, output_file, engine='xlsxwriter', output_format='xlsx'):
+    if output_format == 'csv':
+        data_elements.to_csv(output_file, index=False)
+    elif output_format == 'parquet':
+        # needs pyarrow or fastparquet installed
+        data_elements.to_parquet(output_file, index=False)
+    elif output_format != 'xlsx':
+        raise ValueError(f"Unsupported output format: {output_format}")
+    elif engine == 'openpyxl':
+        # needs openpyxl installed, it isn't in requirements.txt
+        # pandas doesn't open openpyxl in write-only mode, so stream rows ourselves
+        write_openpyxl_streaming(data_elements, output_file)
+    else:
+        # xlsxwriter serializes much faster than pandas' default openpyxl engine
+        data_elements.to_excel(output_file, index=False, engine=engine)
 
 if __name__ == "__main__":
     # specify dataset IDs to fetch data elements from
     dataset_ids = ['Fgv05RXHfNF']  # replace with actual dataset IDs
-    data_elements = fetch_data_elements(DHIS2_BASE_URL, dataset_ids, auth)
+    data_elements = fetch_data_elements(DHIS2_BASE_URL, dataset_ids, session)
     export_to_excel(data_elements, 'data_elements.xlsx')
     print("Data elements exported to data_elements.xlsx")
\ No newline at end of file
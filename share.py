@@ -1,7 +1,11 @@
 import requests
-import json
+import orjson
 import os
-from typing import Dict, List, Optional, Union
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 from dotenv import load_dotenv
@@ -9,6 +13,17 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Number of objects sent per metadata import when updating sharing in bulk
+IMPORT_BATCH_SIZE = 100
+
+# Pre-2.36 access fields, dropped from re-imported objects so they can't
+# compete with the sharing block being set
+_LEGACY_SHARING_FIELDS = ('publicAccess', 'externalAccess', 'userAccesses', 'userGroupAccesses')
+
+# Default fields requested for users and user groups
+USER_FIELDS = "id,displayName,username"
+USER_GROUP_FIELDS = "id,displayName"
+
 class AccessLevel(Enum):
     """Access levels for DHIS2 sharing"""
     NO_ACCESS = "--------"
@@ -16,6 +31,23 @@ class AccessLevel(Enum):
     READ_WRITE = "rw------"
     READ_WRITE_DELETE = "rwd-----"
 
+# Accepted access strings: the AccessLevel values plus any DHIS2 metadata/data
+# access string (metadata read/write, data read/write, padded with dashes)
+_ACCESS_LEVELS = frozenset(level.value for level in AccessLevel)
+_ACCESS_PATTERN = re.compile(r'[r-][w-][r-][w-]-{4}')
+
+def _validate_access(access: str) -> None:
+    """Raise ValueError for access strings DHIS2 would reject"""
+    if not isinstance(access, str):
+        raise ValueError(
+            f"Invalid access level {access!r}, expected a string such as AccessLevel.READ.value"
+        )
+    if access not in _ACCESS_LEVELS and not _ACCESS_PATTERN.fullmatch(access):
+        raise ValueError(
+            f"Invalid access level {access!r}, expected an AccessLevel value {sorted(_ACCESS_LEVELS)} "
+            f"or a metadata/data access string like 'rwrw----' (metadata rw, data rw, then '----')"
+        )
+
 @dataclass
 class UserAccess:
     """Represents user access settings"""
@@ -43,11 +75,14 @@ class SharingSettings:
             self.users = []
         if self.user_groups is None:
             self.user_groups = []
+        _validate_access(self.public_access)
+        for access in self.users + self.user_groups:
+            _validate_access(access.access)
 
 class DHIS2SharingClient:
     """Client for managing DHIS2 metadata sharing"""
     
-    def __init__(self, base_url: str, username: str, password: str):
+    def __init__(self, base_url: str, username: str, password: str, max_workers: int = 16):
         """
         Initialize DHIS2 sharing client
         
@@ -55,15 +90,51 @@ class DHIS2SharingClient:
             base_url: DHIS2 instance URL (e.g., 'https://play.dhis2.org/demo')
             username: DHIS2 username
             password: DHIS2 password
+            max_workers: Number of concurrent requests used for per-object updates
         """
         self.base_url = base_url.rstrip('/')
         self.auth = (username, password)
+        self.max_workers = max_workers
         self.session = requests.Session()
         self.session.auth = self.auth
+        
+        # Size the connection pool so concurrent requests reuse connections, and
+        # retry transient gateway errors instead of failing the whole operation
+        retry = Retry(
+            total=5,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=('GET', 'PUT', 'POST')
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        
+        # Fetched lists keyed by the fields they were requested with
+        self._users_cache: Dict[str, List[Dict]] = {}
+        self._user_groups_cache: Dict[str, List[Dict]] = {}
+        self._category_options_cache: Dict[str, List[Dict]] = {}
+        
+        # Users and groups found by previous lookups, keyed by username / group name.
+        # Misses are not stored, so objects created later are still found.
+        self._users_by_username: Dict[str, Dict] = {}
+        self._user_groups_by_name: Dict[str, Dict] = {}
+    
+    def close(self) -> None:
+        """Close the HTTP session and its pooled connections"""
+        self.session.close()
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached lists and lookups so the next call refetches from DHIS2"""
+        self._users_cache.clear()
+        self._user_groups_cache.clear()
+        self._category_options_cache.clear()
+        self._users_by_username.clear()
+        self._user_groups_by_name.clear()
     
     def get_sharing_settings(self, metadata_type: str, metadata_id: str) -> Dict:
         """
@@ -81,33 +152,35 @@ class DHIS2SharingClient:
         try:
             response = self.session.get(url)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return orjson.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Failed to get sharing settings: {e}")
     
     def update_sharing_settings(self, metadata_type: str, metadata_id: str, 
-                              sharing_settings: Union[SharingSettings, Dict]) -> Dict:
+                              sharing_settings: Union[SharingSettings, Dict, bytes]) -> Dict:
         """
         Update sharing settings for a metadata object
         
         Args:
             metadata_type: Type of metadata (e.g., 'categoryOptions', 'dataElements')
             metadata_id: ID of the metadata object
-            sharing_settings: New sharing settings
+            sharing_settings: New sharing settings, or an already serialized JSON body
             
         Returns:
             Response from DHIS2 API
         """
         url = f"{self.base_url}/api/{metadata_type}/{metadata_id}/sharing"
         
-        # Convert SharingSettings to dict if needed
+        # Serialize to a JSON body unless the caller already did
         if isinstance(sharing_settings, SharingSettings):
-            data = self._sharing_settings_to_dict(sharing_settings)
+            body = orjson.dumps(self._sharing_settings_to_dict(sharing_settings))
+        elif isinstance(sharing_settings, bytes):
+            body = sharing_settings
         else:
-            data = sharing_settings
+            body = orjson.dumps(sharing_settings)
         
         try:
-            response = self.session.put(url, json=data)
+            response = self.session.put(url, data=body)
             response.raise_for_status()
             
             # Handle empty responses
@@ -115,7 +188,7 @@ class DHIS2SharingClient:
                 return {"status": "success", "message": "Sharing settings updated successfully"}
             
             try:
-                return response.json()
+                return orjson.loads(response.content)
             except ValueError as json_error:
                 # If JSON parsing fails, return the raw text
                 return {
@@ -169,104 +242,309 @@ class DHIS2SharingClient:
         Returns:
             List of responses from DHIS2 API
         """
-        results = []
-        for option_id in category_option_ids:
+        # Validate once up front rather than failing every request at the server
+        _validate_access(public_access)
+        for access in (users or []) + (user_groups or []):
+            _validate_access(access.access)
+        
+        # Build the sharing payload once, it is identical for every option
+        sharing_data = self._build_sharing_dict(
+            public_access,
+            self._build_users_dict(users or []),
+            self._build_groups_dict(user_groups or [])
+        )
+        
+        outcomes = self._share_objects('categoryOptions', category_option_ids, sharing_data)
+        return [{'id': option_id, **outcomes[option_id]} for option_id in category_option_ids]
+    
+    def _get_owner_objects(self, metadata_type: str, metadata_ids: List[str]) -> List[Dict]:
+        """Get the complete owner objects for IDs, as the metadata import expects them"""
+        url = f"{self.base_url}/api/{metadata_type}"
+        params = {'fields': ':owner', 'filter': f"id:in:[{','.join(metadata_ids)}]", 'paging': 'false'}
+        
+        try:
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            return orjson.loads(response.content).get(metadata_type, [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise Exception(f"Failed to get {metadata_type} for import: {e}")
+    
+    def _import_sharing(self, metadata_type: str, metadata_ids: List[str],
+                        sharing: Dict) -> Tuple[Dict[str, str], Dict]:
+        """
+        Update sharing for many objects in a single metadata import
+        
+        The import validates and replaces whole objects, so the complete owner
+        objects are fetched first and only their sharing block is changed.
+        
+        Args:
+            metadata_type: Type of metadata (e.g., 'categoryOptions', 'dataElements')
+            metadata_ids: IDs of the metadata objects
+            sharing: Sharing block to set on every object
+            
+        Returns:
+            Reasons keyed by the IDs the import didn't update, and the import report
+        """
+        objects = self._get_owner_objects(metadata_type, metadata_ids)
+        found = {obj.get('id') for obj in objects}
+        rejected = {
+            metadata_id: "Object was not returned by the server"
+            for metadata_id in metadata_ids if metadata_id not in found
+        }
+        if not objects:
+            return rejected, None
+        
+        for obj in objects:
+            for field in _LEGACY_SHARING_FIELDS:
+                obj.pop(field, None)
+            obj['sharing'] = sharing
+        
+        url = f"{self.base_url}/api/metadata"
+        params = {'importStrategy': 'UPDATE', 'atomicMode': 'NONE'}
+        
+        try:
+            response = self.session.post(url, params=params, data=orjson.dumps({metadata_type: objects}))
+            # DHIS2 answers 409 when some objects were rejected, with the import report in the body
+            if response.status_code != 409:
+                response.raise_for_status()
+            report = orjson.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise Exception(f"Failed to import sharing settings: {e}")
+        
+        # Newer DHIS2 versions wrap the import report in a web message
+        report = report.get('response', report)
+        
+        try:
+            for type_report in report.get('typeReports', []):
+                for object_report in type_report.get('objectReports', []):
+                    errors = object_report.get('errorReports')
+                    if errors:
+                        # index refers to the position in the imported objects
+                        object_id = object_report.get('uid') or objects[object_report['index']]['id']
+                        rejected[object_id] = '; '.join(error.get('message', '') for error in errors)
+        except (KeyError, IndexError):
+            # The report doesn't say which objects failed, so retry them all
+            return {metadata_id: "Import report did not identify the failed objects" for metadata_id in metadata_ids}, report
+        
+        if report.get('status') == 'ERROR' and not rejected:
+            raise Exception("Failed to import sharing settings: import was rejected")
+        
+        return rejected, report
+    
+    def _share_objects(self, metadata_type: str, metadata_ids: List[str], sharing_data: Dict) -> Dict[str, Dict]:
+        """
+        Apply the same sharing settings to many metadata objects
+        
+        Objects are updated through bulk metadata imports; any object the
+        import rejects is retried through its own sharing endpoint, and its
+        outcome keeps the import error under 'import_error'.
+        
+        Args:
+            metadata_type: Type of metadata (e.g., 'categoryOptions', 'dataElements')
+            metadata_ids: IDs of the metadata objects
+            sharing_data: Sharing settings in the format expected by DHIS2 API
+            
+        Returns:
+            Outcome for each object ID
+        """
+        # Serialize once, every fallback request carries the same settings
+        body = orjson.dumps(sharing_data)
+        
+        outcomes = {}
+        fallback_ids = []
+        import_errors = {}
+        for start in range(0, len(metadata_ids), IMPORT_BATCH_SIZE):
+            batch = metadata_ids[start:start + IMPORT_BATCH_SIZE]
             try:
-                result = self.share_category_option(
-                    option_id, users, user_groups, public_access
-                )
-                results.append({
-                    'id': option_id,
-                    'status': 'success',
-                    'response': result
-                })
+                rejected, report = self._import_sharing(metadata_type, batch, sharing_data['sharing'])
             except Exception as e:
-                results.append({
-                    'id': option_id,
-                    'status': 'error',
-                    'error': str(e)
-                })
-        return results
+                print(f"Metadata import failed for {len(batch)} objects: {e}")
+                rejected, report = {metadata_id: str(e) for metadata_id in batch}, None
+            
+            for metadata_id in batch:
+                if metadata_id in rejected:
+                    fallback_ids.append(metadata_id)
+                    import_errors[metadata_id] = rejected[metadata_id]
+                else:
+                    outcomes[metadata_id] = {
+                        'status': 'success',
+                        'response': report
+                    }
+        
+        if fallback_ids:
+            print(f"Updating {len(fallback_ids)} objects individually...")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.update_sharing_settings, metadata_type, metadata_id, body): metadata_id
+                for metadata_id in fallback_ids
+            }
+            for future in as_completed(futures):
+                metadata_id = futures[future]
+                try:
+                    outcomes[metadata_id] = {
+                        'status': 'success',
+                        'response': future.result()
+                    }
+                except Exception as e:
+                    outcomes[metadata_id] = {
+                        'status': 'error',
+                        'error': str(e)
+                    }
+                # Keep why the bulk import didn't cover this object
+                outcomes[metadata_id]['import_error'] = import_errors[metadata_id]
+        
+        return outcomes
     
-    def get_users(self, fields: str = "id,displayName,username") -> List[Dict]:
-        """Get list of users from DHIS2"""
+    def get_users(self, fields: str = USER_FIELDS, force: bool = False) -> List[Dict]:
+        """
+        Get list of users from DHIS2, cached per fields unless force is set
+        
+        The returned list is a copy, but its user dicts are shared with the cache.
+        """
+        if not force and fields in self._users_cache:
+            return list(self._users_cache[fields])
+        
         url = f"{self.base_url}/api/users"
         params = {'fields': fields, 'paging': 'false'}
         
         try:
             response = self.session.get(url, params=params)
             response.raise_for_status()
-            return response.json().get('users', [])
-        except requests.exceptions.RequestException as e:
+            self._users_cache[fields] = orjson.loads(response.content).get('users', [])
+            # Lookups may have memoized users from the previous list
+            self._users_by_username.clear()
+            return list(self._users_cache[fields])
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Failed to get users: {e}")
     
-    def get_user_groups(self, fields: str = "id,displayName") -> List[Dict]:
-        """Get list of user groups from DHIS2"""
+    def get_user_groups(self, fields: str = USER_GROUP_FIELDS, force: bool = False) -> List[Dict]:
+        """
+        Get list of user groups from DHIS2, cached per fields unless force is set
+        
+        The returned list is a copy, but its group dicts are shared with the cache.
+        """
+        if not force and fields in self._user_groups_cache:
+            return list(self._user_groups_cache[fields])
+        
         url = f"{self.base_url}/api/userGroups"
         params = {'fields': fields, 'paging': 'false'}
         
         try:
             response = self.session.get(url, params=params)
             response.raise_for_status()
-            return response.json().get('userGroups', [])
-        except requests.exceptions.RequestException as e:
+            self._user_groups_cache[fields] = orjson.loads(response.content).get('userGroups', [])
+            # Lookups may have memoized user groups from the previous list
+            self._user_groups_by_name.clear()
+            return list(self._user_groups_cache[fields])
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Failed to get user groups: {e}")
     
-    def get_category_options(self, fields: str = "id,displayName,code") -> List[Dict]:
-        """Get list of category options from DHIS2"""
+    def get_category_options(self, fields: str = "id,displayName,code", force: bool = False) -> List[Dict]:
+        """
+        Get list of category options from DHIS2, cached per fields unless force is set
+        
+        The returned list is a copy, but its category option dicts are shared with the cache.
+        """
+        if not force and fields in self._category_options_cache:
+            return list(self._category_options_cache[fields])
+        
         url = f"{self.base_url}/api/categoryOptions"
         params = {'fields': fields, 'paging': 'false'}
         
         try:
             response = self.session.get(url, params=params)
             response.raise_for_status()
-            return response.json().get('categoryOptions', [])
-        except requests.exceptions.RequestException as e:
+            self._category_options_cache[fields] = orjson.loads(response.content).get('categoryOptions', [])
+            return list(self._category_options_cache[fields])
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Failed to get category options: {e}")
     
-    def _sharing_settings_to_dict(self, settings: SharingSettings) -> Dict:
-        """Convert SharingSettings to dictionary format expected by DHIS2 API"""
-        
-        # Convert users list to dict with user IDs as keys
-        users_dict = {}
-        for user in settings.users:
-            users_dict[user.id] = {
-                'access': user.access,
-                'displayName': user.displayName
-            }
-        
-        # Convert user groups list to dict with group IDs as keys  
-        user_groups_dict = {}
-        for group in settings.user_groups:
-            user_groups_dict[group.id] = {
-                'access': group.access,
-                'displayName': group.displayName
-            }
+    def _find_one(self, metadata_type: str, property_name: str, value: str, fields: str) -> Optional[Dict]:
+        """Get the first object whose property equals value, filtered server-side"""
+        url = f"{self.base_url}/api/{metadata_type}"
+        params = {'filter': f'{property_name}:eq:{value}', 'fields': fields, 'paging': 'false'}
         
+        try:
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            objects = orjson.loads(response.content).get(metadata_type, [])
+            return objects[0] if objects else None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise Exception(f"Failed to find {metadata_type} with {property_name} '{value}': {e}")
+    
+    def _build_users_dict(self, users: List[UserAccess]) -> Dict:
+        """Convert users list to dict with user IDs as keys"""
+        return {
+            user.id: {'id': user.id, 'access': user.access, 'displayName': user.displayName}
+            for user in users
+        }
+    
+    def _build_groups_dict(self, user_groups: List[UserGroupAccess]) -> Dict:
+        """Convert user groups list to dict with group IDs as keys"""
+        return {
+            group.id: {'id': group.id, 'access': group.access, 'displayName': group.displayName}
+            for group in user_groups
+        }
+    
+    def _build_sharing_dict(self, public_access: str, users_dict: Dict, user_groups_dict: Dict,
+                            external_access: bool = False) -> Dict:
+        """Assemble pre-built user and group dicts into the format expected by DHIS2 API"""
         return {
             'sharing': {
-                'external': settings.external_access,
+                'external': external_access,
                 'users': users_dict,
                 'userGroups': user_groups_dict,
-                'public': settings.public_access
+                'public': public_access
             }
         }
     
+    def _sharing_settings_to_dict(self, settings: SharingSettings) -> Dict:
+        """Convert SharingSettings to dictionary format expected by DHIS2 API"""
+        return self._build_sharing_dict(
+            settings.public_access,
+            self._build_users_dict(settings.users),
+            self._build_groups_dict(settings.user_groups),
+            settings.external_access
+        )
+    
+    def _normalize_sharing(self, sharing: Optional[Dict]) -> Tuple:
+        """Reduce a sharing block to the parts that decide access, for comparison"""
+        sharing = sharing or {}
+        return (
+            sharing.get('public'),
+            bool(sharing.get('external')),
+            {uid: entry.get('access') for uid, entry in (sharing.get('users') or {}).items()},
+            {uid: entry.get('access') for uid, entry in (sharing.get('userGroups') or {}).items()}
+        )
+    
     def find_user_by_username(self, username: str) -> Optional[Dict]:
         """Find user by username"""
-        users = self.get_users()
-        for user in users:
-            if user.get('username') == username:
-                return user
-        return None
+        user = self._users_by_username.get(username)
+        if user is None:
+            users = self._users_cache.get(USER_FIELDS)
+            if users is not None:
+                # Reuse the user list a bulk operation already fetched
+                user = next((u for u in users if u.get('username') == username), None)
+            if user is None:
+                # Not in the cached list, the user may have been created since
+                user = self._find_one('users', 'username', username, USER_FIELDS)
+            if user is not None:
+                self._users_by_username[username] = user
+        return user
     
     def find_user_group_by_name(self, name: str) -> Optional[Dict]:
         """Find user group by name"""
-        groups = self.get_user_groups()
-        for group in groups:
-            if group.get('displayName') == name:
-                return group
-        return None
+        group = self._user_groups_by_name.get(name)
+        if group is None:
+            groups = self._user_groups_cache.get(USER_GROUP_FIELDS)
+            if groups is not None:
+                group = next((g for g in groups if g.get('displayName') == name), None)
+            if group is None:
+                group = self._find_one('userGroups', 'displayName', name, USER_GROUP_FIELDS)
+            if group is not None:
+                self._user_groups_by_name[name] = group
+        return group
 
     def share_all_category_options_with_all_users(self, access_level: str = AccessLevel.READ.value) -> List[Dict]:
         """
@@ -277,16 +555,22 @@ class DHIS2SharingClient:
             
         Returns:
             List of results for each category option
+            
+        Raises:
+            ValueError: If access_level is not a valid DHIS2 access string
         """
+        _validate_access(access_level)
+        
         try:
-            # Get all category options
+            # Get all category options with their current sharing, always fresh
             print("Fetching all category options...")
-            category_options = self.get_category_options()
+            option_fields = "id,displayName,sharing"
+            category_options = self.get_category_options(fields=option_fields, force=True)
             print(f"Found {len(category_options)} category options")
             
-            # Get all users
+            # Get all users, always fresh so new users are included
             print("Fetching all users...")
-            users = self.get_users()
+            users = self.get_users(force=True)
             print(f"Found {len(users)} users")
             
             if not category_options:
@@ -307,43 +591,64 @@ class DHIS2SharingClient:
             
             print(f"Sharing {len(category_options)} category options with {len(user_access_list)} users...")
             
-            # Share each category option with all users
+            # Share every category option with all users in bulk
+            sharing_data = self._build_sharing_dict(
+                access_level,
+                self._build_users_dict(user_access_list),
+                {}
+            )
+            
+            # Skip options whose sharing already matches, re-runs then write almost nothing
+            desired = self._normalize_sharing(sharing_data['sharing'])
+            option_ids = [
+                option['id'] for option in category_options
+                if self._normalize_sharing(option.get('sharing')) != desired
+            ]
+            print(f"{len(category_options) - len(option_ids)} category options already shared, updating {len(option_ids)}")
+            outcomes = self._share_objects('categoryOptions', option_ids, sharing_data)
+            
+            # The fetched sharing state is now stale
+            self._category_options_cache.pop(option_fields, None)
+            
             results = []
-            for i, option in enumerate(category_options, 1):
+            successful = 0
+            skipped = 0
+            failed = 0
+            for option in category_options:
                 option_id = option['id']
                 option_name = option.get('displayName', 'Unknown')
+                outcome = outcomes.get(option_id)
                 
-                print(f"Processing {i}/{len(category_options)}: {option_name}")
-                
-                try:
-                    result = self.share_category_option(
-                        option_id,
-                        users=user_access_list,
-                        public_access=access_level
-                    )
-                    
+                if outcome is None:
+                    results.append({
+                        'id': option_id,
+                        'name': option_name,
+                        'status': 'skipped',
+                        'users_shared_with': len(user_access_list)
+                    })
+                    skipped += 1
+                elif outcome['status'] == 'success':
                     results.append({
                         'id': option_id,
                         'name': option_name,
                         'status': 'success',
                         'users_shared_with': len(user_access_list),
-                        'response': result
+                        'response': outcome['response']
                     })
-                    
-                except Exception as e:
+                    successful += 1
+                else:
                     results.append({
                         'id': option_id,
                         'name': option_name,
                         'status': 'error',
-                        'error': str(e)
+                        'error': outcome['error']
                     })
+                    failed += 1
             
             # Summary
-            successful = len([r for r in results if r['status'] == 'success'])
-            failed = len([r for r in results if r['status'] == 'error'])
-            
             print(f"\nSharing completed:")
             print(f"  Successful: {successful}")
+            print(f"  Skipped (already shared): {skipped}")
             print(f"  Failed: {failed}")
             print(f"  Total: {len(results)}")
             
@@ -378,20 +683,24 @@ def example_usage():
         print("Starting bulk sharing operation...")
         results = client.share_all_category_options_with_all_users(AccessLevel.READ.value)
         
-        # Display detailed results
+        # Display detailed results, tallying outcomes as we go
         print("\nDetailed Results:")
+        successful = 0
+        skipped = 0
         for result in results:
             if result['status'] == 'success':
+                successful += 1
                 print(f"✓ {result['name']} - Shared with {result['users_shared_with']} users")
+            elif result['status'] == 'skipped':
+                skipped += 1
+                print(f"- {result['name']} - Already shared with {result['users_shared_with']} users")
             else:
                 print(f"✗ {result.get('name', 'Unknown')} - Error: {result.get('error', result.get('message', 'Unknown error'))}")
-        
-        # Show summary statistics
-        successful = len([r for r in results if r['status'] == 'success'])
-        failed = len([r for r in results if r['status'] == 'error'])
+        failed = len(results) - successful - skipped
         
         print(f"\nFinal Summary:")
         print(f"Successfully shared: {successful} category options")
+        print(f"Already shared: {skipped} category options")
         print(f"Failed to share: {failed} category options")
         print(f"Total processed: {len(results)} category options")
             
@@ -0,0 +1,84 @@
+import re
+import time
+import unittest
+from unittest import mock
+
+import orjson
+import requests
+
+import data_elements_to_excel
+
+
+def make_dataset(dataset_id):
+    return {
+        "id": dataset_id,
+        "dataSetElements": [
+            {"dataElement": {
+                "id": f"{dataset_id}-de{n}",
+                "displayName": f"{dataset_id} element {n}",
+                "code": f"{dataset_id}_{n}",
+                "valueType": "NUMBER",
+                "categoryCombo": {"id": "ccDefault", "displayName": "default"},
+            }}
+            for n in range(2)
+        ],
+    }
+
+
+class FetchDataElementsTest(unittest.TestCase):
+    """Tests for the batched, concurrent dataset fetch in fetch_data_elements"""
+
+    def setUp(self):
+        self.known = {f"ds{n}" for n in range(7)}
+        self.requested = []
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.get.side_effect = self.get
+        patcher = mock.patch.object(data_elements_to_excel, "BATCH_SIZE", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url):
+        ids = re.search(r"filter=id:in:\[([^\]]*)\]", url).group(1).split(",")
+        self.requested.append(ids)
+        # Earlier batches answer last, and each batch comes back in reverse order
+        time.sleep(0.02 if "ds0" in ids else 0)
+        datasets = [make_dataset(i) for i in reversed(ids) if i in self.known]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = orjson.dumps({"dataSets": datasets})
+        return response
+
+    def fetch(self, dataset_ids):
+        return data_elements_to_excel.fetch_data_elements("https://dhis2.example.org", dataset_ids, self.session)
+
+    def test_rows_follow_input_order(self):
+        dataset_ids = ["ds0", "ds3", "ds1", "ds6", "ds2"]
+        df = self.fetch(dataset_ids)
+
+        self.assertEqual(sorted(len(batch) for batch in self.requested), [1, 2, 2])
+        self.assertEqual(sorted(i for batch in self.requested for i in batch), sorted(dataset_ids))
+        self.assertEqual(list(df["Dataset ID"]), [i for i in dataset_ids for _ in range(2)])
+        self.assertEqual(list(df["Data Element ID"][:2]), ["ds0-de0", "ds0-de1"])
+        self.assertEqual(list(df["Code"][2:4]), ["ds3_0", "ds3_1"])
+        self.assertEqual(set(df["Domain Type"]), {""})
+
+    def test_duplicate_ids_repeat_their_rows(self):
+        df = self.fetch(["ds1", "ds2", "ds1"])
+        self.assertEqual(list(df["Dataset ID"]), ["ds1", "ds1", "ds2", "ds2", "ds1", "ds1"])
+
+    def test_missing_dataset_raises(self):
+        with self.assertRaises(ValueError) as context:
+            self.fetch(["ds0", "dsMissing", "ds4"])
+        self.assertIn("dsMissing", str(context.exception))
+        self.assertNotIn("ds0", str(context.exception))
+
+    def test_columns(self):
+        df = self.fetch(["ds5"])
+        self.assertEqual(list(df.columns), [
+            "Dataset ID", "Data Element ID", "Display Name", "Code",
+            "Domain Type", "Value Type", "Category Combo ID", "Category Combo Name",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
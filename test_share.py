@@ -0,0 +1,355 @@
+import unittest
+from unittest import mock
+
+import orjson
+import requests
+
+from share import AccessLevel, DHIS2SharingClient, SharingSettings, UserAccess
+
+
+def make_response(status_code: int, content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.url = "https://dhis2.example.org/api/metadata"
+    return response
+
+
+class ImportSharingTest(unittest.TestCase):
+    """Tests for the bulk metadata import in _import_sharing"""
+
+    def setUp(self):
+        self.client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+        self.ids = ["optionAAAAA", "optionBBBBB", "optionCCCCC"]
+        self.owner_objects = [
+            {"id": object_id, "name": f"Option {object_id}", "shortName": object_id}
+            for object_id in self.ids
+        ]
+        self.sharing = {
+            "public": "r-------",
+            "external": False,
+            "users": {"userAAAAAAA": {"id": "userAAAAAAA", "access": "r-------", "displayName": "A"}},
+            "userGroups": {}
+        }
+
+    def import_with(self, status_code: int, body, owner_objects=None):
+        content = body if isinstance(body, bytes) else orjson.dumps(body)
+        owners = self.owner_objects if owner_objects is None else owner_objects
+        owner_response = make_response(200, orjson.dumps({"categoryOptions": owners}))
+        with mock.patch.object(self.client.session, "get", return_value=owner_response) as get, \
+                mock.patch.object(self.client.session, "post", return_value=make_response(status_code, content)) as post:
+            result = self.client._import_sharing("categoryOptions", self.ids, self.sharing)
+        self.get, self.post = get, post
+        return result
+
+    def test_ok_report_rejects_nothing(self):
+        report = {"status": "OK", "stats": {"updated": 3}, "typeReports": []}
+        rejected, returned = self.import_with(200, report)
+        self.assertEqual(rejected, {})
+        self.assertEqual(returned, report)
+
+    def test_imports_complete_owner_objects_with_new_sharing(self):
+        owners = [dict(obj, publicAccess="--------", userAccesses=[]) for obj in self.owner_objects]
+        self.import_with(200, {"status": "OK", "typeReports": []}, owner_objects=owners)
+
+        self.assertEqual(self.get.call_args.kwargs["params"]["fields"], ":owner")
+        self.assertEqual(self.get.call_args.kwargs["params"]["filter"], f"id:in:[{','.join(self.ids)}]")
+        self.assertNotIn("mergeMode", self.post.call_args.kwargs["params"])
+        imported = orjson.loads(self.post.call_args.kwargs["data"])["categoryOptions"]
+        self.assertEqual([obj["id"] for obj in imported], self.ids)
+        for obj in imported:
+            self.assertEqual(obj["name"], f"Option {obj['id']}")
+            self.assertEqual(obj["sharing"], self.sharing)
+            self.assertNotIn("publicAccess", obj)
+            self.assertNotIn("userAccesses", obj)
+
+    def test_objects_not_returned_by_server_are_rejected(self):
+        rejected, _ = self.import_with(200, {"status": "OK", "typeReports": []},
+                                       owner_objects=self.owner_objects[:2])
+        self.assertEqual(set(rejected), {"optionCCCCC"})
+
+    def test_no_objects_returned_skips_import(self):
+        rejected, report = self.import_with(200, {"status": "OK"}, owner_objects=[])
+        self.assertEqual(set(rejected), set(self.ids))
+        self.assertIsNone(report)
+        self.post.assert_not_called()
+
+    def test_conflict_body_is_parsed_for_rejected_uids(self):
+        report = {
+            "status": "WARNING",
+            "typeReports": [{"objectReports": [
+                {"uid": "optionBBBBB", "index": 1, "errorReports": [{"message": "Missing name"}]},
+                {"uid": "optionCCCCC", "index": 2, "errorReports": []},
+            ]}],
+        }
+        rejected, _ = self.import_with(409, report)
+        self.assertEqual(rejected, {"optionBBBBB": "Missing name"})
+
+    def test_web_message_wrapper_is_unwrapped(self):
+        body = {
+            "httpStatus": "Conflict",
+            "response": {"status": "WARNING", "typeReports": [{"objectReports": [
+                {"uid": "optionAAAAA", "errorReports": [{"message": "Missing name"}]},
+            ]}]},
+        }
+        rejected, _ = self.import_with(409, body)
+        self.assertEqual(set(rejected), {"optionAAAAA"})
+
+    def test_index_refers_to_imported_object_order(self):
+        # The server may return the owner objects in a different order than requested
+        owners = list(reversed(self.owner_objects))
+        report = {"status": "WARNING", "typeReports": [{"objectReports": [
+            {"index": 0, "errorReports": [{"message": "Missing name"}]},
+        ]}]}
+        rejected, _ = self.import_with(409, report, owner_objects=owners)
+        self.assertEqual(set(rejected), {"optionCCCCC"})
+
+    def test_unattributable_errors_reject_whole_batch(self):
+        report = {"status": "WARNING", "typeReports": [{"objectReports": [
+            {"errorReports": [{"message": "Missing name"}]},
+        ]}]}
+        rejected, _ = self.import_with(409, report)
+        self.assertEqual(set(rejected), set(self.ids))
+
+    def test_error_status_without_object_reports_raises(self):
+        with self.assertRaises(Exception):
+            self.import_with(409, {"status": "ERROR", "typeReports": []})
+
+    def test_non_json_body_raises(self):
+        with self.assertRaises(Exception):
+            self.import_with(200, b"<html>Bad gateway</html>")
+
+    def test_http_error_raises(self):
+        with self.assertRaises(Exception):
+            self.import_with(500, {"status": "ERROR"})
+
+
+class ShareObjectsTest(unittest.TestCase):
+    """Tests for the bulk import with per-object fallback in _share_objects"""
+
+    def setUp(self):
+        self.client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+        self.sharing_data = self.client._build_sharing_dict("r-------", {}, {})
+
+    def test_failed_import_is_reported_on_fallback_outcomes(self):
+        with mock.patch.object(self.client, "_import_sharing", side_effect=Exception("import exploded")), \
+                mock.patch.object(self.client, "update_sharing_settings", return_value={"status": "OK"}) as update:
+            outcomes = self.client._share_objects("categoryOptions", ["optionAAAAA"], self.sharing_data)
+
+        update.assert_called_once()
+        self.assertEqual(outcomes["optionAAAAA"]["status"], "success")
+        self.assertEqual(outcomes["optionAAAAA"]["import_error"], "import exploded")
+
+    def test_rejection_reason_is_kept_when_fallback_fails(self):
+        rejected = ({"optionAAAAA": "Missing name"}, {"status": "WARNING"})
+        with mock.patch.object(self.client, "_import_sharing", return_value=rejected), \
+                mock.patch.object(self.client, "update_sharing_settings", side_effect=Exception("HTTP 403")):
+            outcomes = self.client._share_objects("categoryOptions", ["optionAAAAA", "optionBBBBB"], self.sharing_data)
+
+        self.assertEqual(outcomes["optionAAAAA"], {"status": "error", "error": "HTTP 403", "import_error": "Missing name"})
+        self.assertEqual(outcomes["optionBBBBB"], {"status": "success", "response": {"status": "WARNING"}})
+
+
+class ListResponseTest(unittest.TestCase):
+    """Tests for decoding list responses"""
+
+    def setUp(self):
+        self.client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+
+    def test_non_json_body_is_wrapped(self):
+        response = make_response(200, b"<html>Proxy error</html>")
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            with self.assertRaisesRegex(Exception, "Failed to get users"):
+                self.client.get_users()
+
+
+class LookupCacheTest(unittest.TestCase):
+    """Tests for memoized user and user group lookups"""
+
+    def setUp(self):
+        self.client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+
+    def test_hit_is_memoized(self):
+        user = {"id": "userAAAAAAA", "username": "alice"}
+        with mock.patch.object(self.client, "_find_one", return_value=user) as find_one:
+            self.assertEqual(self.client.find_user_by_username("alice"), user)
+            self.assertEqual(self.client.find_user_by_username("alice"), user)
+        find_one.assert_called_once()
+
+    def test_miss_is_not_memoized(self):
+        user = {"id": "userAAAAAAA", "username": "alice"}
+        with mock.patch.object(self.client, "_find_one", side_effect=[None, user]):
+            self.assertIsNone(self.client.find_user_by_username("alice"))
+            self.assertEqual(self.client.find_user_by_username("alice"), user)
+
+    def test_group_miss_is_not_memoized(self):
+        group = {"id": "groupAAAAAA", "displayName": "Admins"}
+        with mock.patch.object(self.client, "_find_one", side_effect=[None, group]):
+            self.assertIsNone(self.client.find_user_group_by_name("Admins"))
+            self.assertEqual(self.client.find_user_group_by_name("Admins"), group)
+
+
+class ListCacheTest(unittest.TestCase):
+    """Tests for memoized user lists and how lookups reuse them"""
+
+    def setUp(self):
+        self.client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+
+    def users_response(self, users):
+        return make_response(200, orjson.dumps({"users": users}))
+
+    def test_lookup_reuses_cached_list(self):
+        alice = {"id": "userAAAAAAA", "username": "alice"}
+        with mock.patch.object(self.client.session, "get", return_value=self.users_response([alice])):
+            self.client.get_users()
+        with mock.patch.object(self.client, "_find_one") as find_one:
+            self.assertEqual(self.client.find_user_by_username("alice"), alice)
+        find_one.assert_not_called()
+
+    def test_user_created_after_miss_is_found_after_refetch(self):
+        alice = {"id": "userAAAAAAA", "username": "alice"}
+        with mock.patch.object(self.client, "_find_one", return_value=None):
+            self.assertIsNone(self.client.find_user_by_username("alice"))
+        with mock.patch.object(self.client.session, "get", return_value=self.users_response([alice])):
+            self.assertEqual(self.client.get_users(force=True), [alice])
+        with mock.patch.object(self.client, "_find_one") as find_one:
+            self.assertEqual(self.client.find_user_by_username("alice"), alice)
+        find_one.assert_not_called()
+
+    def test_refetch_replaces_memoized_lookups(self):
+        old = {"id": "userAAAAAAA", "username": "alice", "displayName": "Old"}
+        new = {"id": "userAAAAAAA", "username": "alice", "displayName": "New"}
+        with mock.patch.object(self.client, "_find_one", return_value=old):
+            self.assertEqual(self.client.find_user_by_username("alice"), old)
+        with mock.patch.object(self.client.session, "get", return_value=self.users_response([new])):
+            self.client.get_users(force=True)
+        self.assertEqual(self.client.find_user_by_username("alice"), new)
+
+    def test_miss_in_cached_list_queries_server(self):
+        bob = {"id": "userBBBBBBB", "username": "bob"}
+        with mock.patch.object(self.client.session, "get", return_value=self.users_response([])):
+            self.client.get_users()
+        with mock.patch.object(self.client, "_find_one", return_value=bob) as find_one:
+            self.assertEqual(self.client.find_user_by_username("bob"), bob)
+        find_one.assert_called_once()
+
+    def test_returned_list_is_a_copy(self):
+        alice = {"id": "userAAAAAAA", "username": "alice"}
+        with mock.patch.object(self.client.session, "get", return_value=self.users_response([alice])):
+            self.client.get_users().clear()
+            self.assertEqual(self.client.get_users(), [alice])
+
+
+class SkipUnchangedSharingTest(unittest.TestCase):
+    """Tests for skipping category options whose sharing already matches"""
+
+    def setUp(self):
+        self.client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+        self.users = [
+            {"id": "userAAAAAAA", "displayName": "User A", "username": "a"},
+            {"id": "userBBBBBBB", "displayName": "User B", "username": "b"},
+        ]
+        # What the server returns once every user has read access
+        self.shared = {
+            "owner": "adminAAAAAA",
+            "public": "r-------",
+            "external": False,
+            "users": {
+                user["id"]: {"id": user["id"], "access": "r-------", "displayName": user["displayName"]}
+                for user in self.users
+            },
+            "userGroups": {},
+        }
+
+    def updated_ids(self, options):
+        with mock.patch.object(self.client, "get_category_options", return_value=options), \
+                mock.patch.object(self.client, "get_users", return_value=self.users), \
+                mock.patch.object(self.client, "_share_objects", return_value={}) as share:
+            results = self.client.share_all_category_options_with_all_users("r-------")
+        return share.call_args.args[1], results
+
+    def option(self, sharing):
+        return {"id": "optionAAAAA", "displayName": "Option A", "sharing": sharing}
+
+    def test_matching_sharing_is_skipped(self):
+        option_ids, results = self.updated_ids([self.option(self.shared)])
+        self.assertEqual(option_ids, [])
+        self.assertEqual(results[0]["status"], "skipped")
+
+    def test_display_names_do_not_matter(self):
+        sharing = dict(self.shared, users={
+            uid: dict(entry, displayName="Renamed") for uid, entry in self.shared["users"].items()
+        })
+        option_ids, _ = self.updated_ids([self.option(sharing)])
+        self.assertEqual(option_ids, [])
+
+    def test_extra_user_group_is_updated(self):
+        sharing = dict(self.shared, userGroups={"groupAAAAAA": {"id": "groupAAAAAA", "access": "r-------"}})
+        option_ids, _ = self.updated_ids([self.option(sharing)])
+        self.assertEqual(option_ids, ["optionAAAAA"])
+
+    def test_different_public_access_is_updated(self):
+        option_ids, _ = self.updated_ids([self.option(dict(self.shared, public="rw------"))])
+        self.assertEqual(option_ids, ["optionAAAAA"])
+
+    def test_different_user_access_is_updated(self):
+        users = dict(self.shared["users"])
+        users["userBBBBBBB"] = dict(users["userBBBBBBB"], access="rw------")
+        option_ids, _ = self.updated_ids([self.option(dict(self.shared, users=users))])
+        self.assertEqual(option_ids, ["optionAAAAA"])
+
+    def test_missing_user_is_updated(self):
+        users = {"userAAAAAAA": self.shared["users"]["userAAAAAAA"]}
+        option_ids, _ = self.updated_ids([self.option(dict(self.shared, users=users))])
+        self.assertEqual(option_ids, ["optionAAAAA"])
+
+    def test_missing_sharing_key_is_updated(self):
+        # Older servers return the legacy access fields instead of a sharing block
+        option = {"id": "optionAAAAA", "displayName": "Option A", "publicAccess": "r-------"}
+        option_ids, _ = self.updated_ids([option])
+        self.assertEqual(option_ids, ["optionAAAAA"])
+
+    def test_empty_sharing_is_updated(self):
+        option_ids, _ = self.updated_ids([self.option(None)])
+        self.assertEqual(option_ids, ["optionAAAAA"])
+
+
+class CloseTest(unittest.TestCase):
+    """Tests for releasing the client's connections"""
+
+    def test_close_shuts_session(self):
+        client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+        with mock.patch.object(client.session, "close") as session_close:
+            client.close()
+        session_close.assert_called_once_with()
+
+
+class AccessValidationTest(unittest.TestCase):
+    """Tests for access string validation"""
+
+    def test_access_levels_and_data_access_strings_are_accepted(self):
+        for access in ("--------", "r-------", "rwd-----", "rwrw----", "r-r-----"):
+            SharingSettings(public_access=access)
+
+    def test_invalid_access_mentions_data_access_pattern(self):
+        with self.assertRaisesRegex(ValueError, "metadata/data access string"):
+            SharingSettings(public_access="read")
+
+    def test_trailing_newline_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SharingSettings(public_access="r-------\n")
+
+    def test_enum_member_instead_of_value_raises_value_error(self):
+        with self.assertRaisesRegex(ValueError, "AccessLevel.READ.value"):
+            SharingSettings(public_access=AccessLevel.READ)
+
+    def test_bulk_share_rejects_enum_member_before_any_request(self):
+        client = DHIS2SharingClient("https://dhis2.example.org/", "admin", "district")
+        with mock.patch.object(client.session, "get") as get:
+            with self.assertRaises(ValueError):
+                client.share_all_category_options_with_all_users(AccessLevel.READ)
+        get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()